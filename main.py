@@ -1,15 +1,23 @@
 import asyncio
 import os
-import json
-from fastapi import FastAPI, BackgroundTasks, HTTPException, status, Query, Path, Body, APIRouter, Request
+import time
+import httpx
+import orjson
+from fastapi import FastAPI, BackgroundTasks, HTTPException, status, Query, Path, Body, APIRouter, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from fastapi.exceptions import RequestValidationError
 from typing import List, Optional, Dict, Any, Union
 from uuid import uuid4
 from datetime import datetime, timezone
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from supabase import create_async_client, AsyncClient
 from sse_starlette.sse import EventSourceResponse
+from contextlib import asynccontextmanager
+import redis.asyncio as aioredis
+from cachetools import TTLCache
 
 # 환경 변수 로드
 load_dotenv()
@@ -18,50 +26,128 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
+# Redis Pub/Sub (멀티 워커 SSE 팬아웃용, 미설정 시 인프로세스 큐 사용)
+REDIS_URL = os.getenv("REDIS_URL")
+EVENTS_CHANNEL = "clt:events"
+
 if not SUPABASE_URL or not SUPABASE_KEY:
     print("Warning: SUPABASE_URL or SUPABASE_KEY is missing in .env file.")
 
-try:
-    supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-except Exception as e:
-    print(f"Failed to initialize Supabase client: {e}")
-    supabase = None
+# 비동기 Supabase 클라이언트 (lifespan에서 초기화)
+supabase: Optional[AsyncClient] = None
+redis_client = None
+
+async def _relay_redis_events():
+    """Redis Pub/Sub 이벤트를 이 워커의 SSE 큐로 중계 (연결이 끊기면 재구독)"""
+    while True:
+        try:
+            async with redis_client.pubsub() as ps:
+                await ps.subscribe(EVENTS_CHANNEL)
+                async for msg in ps.listen():
+                    if msg["type"] != "message":
+                        continue
+                    # 채널 페이로드가 이미 직렬화된 JSON이므로 그대로 팬아웃
+                    _enqueue_event(msg["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # 연결 오류로 중계 태스크가 죽으면 이 워커의 SSE가 영구히 멈추므로
+            # 잠시 대기 후 재접속/재구독
+            print(f"❌ Redis relay error, resubscribing in 1s: {e}")
+            await asyncio.sleep(1.0)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global supabase, redis_client
+    try:
+        supabase = await create_async_client(SUPABASE_URL, SUPABASE_KEY)
+    except Exception as e:
+        print(f"Failed to initialize Supabase client: {e}")
+        supabase = None
+
+    relay_task = None
+    if REDIS_URL:
+        try:
+            redis_client = aioredis.from_url(REDIS_URL, decode_responses=True)
+            relay_task = asyncio.create_task(_relay_redis_events())
+        except Exception as e:
+            print(f"Failed to initialize Redis client: {e}")
+            redis_client = None
+
+    yield
+
+    if relay_task:
+        relay_task.cancel()
+    if redis_client:
+        await redis_client.aclose()
 
 app = FastAPI(
     title="CLT Chatbot API (Supabase Integration)",
     description="API connected to Supabase for CLT Chatbot",
-    version="1.3.0"
+    version="1.3.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # --- CORS 설정 ---
-origins = [
-    "http://localhost:3000",
-    "http://localhost:3000/",
-    "http://localhost:5173",
-    "http://localhost:5173/",
-    "http://127.0.0.1:3000",
-    "http://127.0.0.1:3000/",
-    "http://127.0.0.1:5173",
-    "http://127.0.0.1:5173/",
-    "https://clt-chatbot.vercel.app",
-    "https://clt-chatbot.vercel.app/",
-    "https://react-flow-three-ecru.vercel.app",
-    "https://react-flow-three-ecru.vercel.app/",
-    "http://202.20.84.65:10000",
-    "http://202.20.84.65:10000/",
-    "http://202.20.84.65:10001",
-    "http://202.20.84.65:10001/",
-]
+# 허용 오리진을 리스트 스캔 대신 정규식 한 번으로 매칭
+# (localhost/127.0.0.1 임의 포트, vercel 배포, 사내 IP)
+origin_regex = (
+    r"^(https?://(localhost|127\.0\.0\.1)(:\d+)?"
+    r"|https://(clt-chatbot|react-flow-three-ecru)\.vercel\.app"
+    r"|http://202\.20\.84\.65:1000[01])$"
+)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=origins,
+    allow_origin_regex=origin_regex,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-event_queue = asyncio.Queue()
+# 대형 JSON 응답(시나리오 nodes/edges 등) 압축
+# SSE(text/event-stream)는 스트리밍이라 Starlette GZip이 건드리지 않음
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# 느린 소비자로 인한 무한 적체 방지: 큐를 제한하고 하트비트로 끊긴 연결 감지
+SSE_KEEPALIVE_TIMEOUT = 15.0
+SSE_MAX_QUEUE_SIZE = int(os.getenv("SSE_MAX_QUEUE_SIZE", "1000"))
+
+# 구독자별 큐: 전역 큐 하나를 공유하면 이벤트가 구독자 한 명에게만 전달되고
+# 느린 클라이언트가 나머지를 막으므로, 연결마다 독립 큐를 두고 팬아웃한다
+subscribers: set = set()
+
+def _put_drop_oldest(queue: asyncio.Queue, payload: str):
+    """큐가 가득 차면 가장 오래된 이벤트를 버리고 적재 (drop-oldest)"""
+    while True:
+        try:
+            queue.put_nowait(payload)
+            return
+        except asyncio.QueueFull:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+
+def _enqueue_event(payload: str):
+    """직렬화된 이벤트를 접속 중인 모든 SSE 구독자 큐에 팬아웃"""
+    for queue in list(subscribers):
+        _put_drop_oldest(queue, payload)
+
+async def publish_event(event: Dict[str, Any]):
+    """완료 이벤트 발행: Redis가 있으면 전체 워커로 팬아웃, 없으면 로컬 큐
+
+    직렬화는 여기서 한 번만 수행하고 구독자 수만큼 재인코딩하지 않는다.
+    """
+    payload = orjson.dumps(event).decode()
+    if redis_client:
+        try:
+            await redis_client.publish(EVENTS_CHANNEL, payload)
+            return
+        except Exception as e:
+            print(f"Redis publish failed, falling back to local queue: {e}")
+    _enqueue_event(payload)
 
 # ==========================================
 # [Models]
@@ -157,8 +243,9 @@ class ScenarioDetail(BaseModel):
     name: str
     job: Optional[str] = None
     description: Optional[str] = None
-    nodes: List[Dict[str, Any]] = [] 
-    edges: List[Dict[str, Any]] = []
+    # nodes/edges는 에디터가 만드는 불투명 JSONB - 요소별 검증을 생략
+    nodes: List[Any] = []
+    edges: List[Any] = []
     start_node_id: Optional[str] = None
     created_at: datetime
     updated_at: datetime
@@ -169,8 +256,8 @@ class CreateScenarioRequest(BaseModel):
     job: Optional[str] = "Process"
     description: Optional[str] = ""
     category_id: Optional[str] = None
-    nodes: List[Dict[str, Any]] = []
-    edges: List[Dict[str, Any]] = []
+    nodes: List[Any] = []
+    edges: List[Any] = []
     start_node_id: Optional[str] = None
     clone_from_id: Optional[str] = None
 
@@ -178,8 +265,8 @@ class UpdateScenarioRequest(BaseModel):
     name: str
     job: str
     description: Optional[str] = None
-    nodes: List[Dict[str, Any]]
-    edges: List[Dict[str, Any]]
+    nodes: List[Any]
+    edges: List[Any]
     start_node_id: Optional[str] = None
 
 class PatchScenarioRequest(BaseModel):
@@ -190,6 +277,7 @@ class PatchScenarioRequest(BaseModel):
 
 class ScenarioListResponse(BaseModel):
     scenarios: List[ScenarioListItem]
+    next_cursor: Optional[str] = None
 
 class ApiTemplateCreate(BaseModel):
     name: str
@@ -212,37 +300,91 @@ class CreateSessionRequest(BaseModel):
     scenarioId: str
     slots: Optional[Dict[str, Any]] = None
 
+# 5. Batch Models
+class BatchSubRequest(BaseModel):
+    id: Optional[str] = None
+    method: str = Field("GET", description="HTTP 메서드")
+    url: str = Field(..., description="앱 내부 경로 (예: /conversations)")
+    body: Optional[Any] = None
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest] = []
+
+# 숏컷 트리 검증기 (요청마다 만들지 않도록 모듈 스코프에 1회 생성)
+SHORTCUTS_ADAPTER = TypeAdapter(List[ShortcutCategory])
+
 
 # ==========================================
 # [Helpers]
 # ==========================================
+# 매 호출마다의 timezone 속성 조회를 피하기 위한 모듈 상수
+_UTC = timezone.utc
+
 def get_utc_now():
-    return datetime.now(timezone.utc).isoformat()
+    return datetime.now(_UTC).isoformat()
+
+def first_row_or(res, status_code: int, detail: str):
+    """단일 행 응답 공통 처리: 행이 없으면 HTTPException, 있으면 첫 행 반환"""
+    if not res.data:
+        raise HTTPException(status_code=status_code, detail=detail)
+    return res.data[0]
+
+# 숏컷(id=1)은 읽기 위주 설정 블롭이므로 짧은 TTL로 인메모리 캐시
+SHORTCUTS_CACHE_TTL = 60.0
+_shortcuts_cache = {"data": None, "exp": 0.0}
+
+# 자주 조회되는 목록 응답의 단기 캐시 (쓰기 시 프리픽스 단위로 무효화)
+LIST_CACHE_TTL = 10.0
+_list_cache = TTLCache(maxsize=1024, ttl=LIST_CACHE_TTL)
+
+def invalidate_list_cache(*prefix):
+    """주어진 프리픽스로 시작하는 목록 캐시 항목을 일괄 제거"""
+    for key in [k for k in _list_cache if k[:len(prefix)] == prefix]:
+        _list_cache.pop(key, None)
+
+# 편집 세션 동안 반복 조회되는 단건 리소스(시나리오 상세, 노드 가시성 설정) 캐시
+DETAIL_CACHE_TTL = 30.0
+_detail_cache = TTLCache(maxsize=512, ttl=DETAIL_CACHE_TTL)
+
+# 존재가 확인된 대화 ID 캐시: 활성 세션의 반복 존재 확인 왕복을 생략
+_conv_exists = TTLCache(maxsize=10_000, ttl=300.0)
+
+# 고정 페이로드는 기동 시 1회만 직렬화해 두고 재사용
+DEFAULT_NODE_VISIBILITY = {"visibleNodeTypes": ["message", "form", "api", "branch", "condition"]}
+_default_node_vis_resp = Response(content=orjson.dumps(DEFAULT_NODE_VISIBILITY), media_type="application/json")
+_empty_list_resp = Response(content=b"[]", media_type="application/json")
 
 # ==========================================
 # [Background Tasks]
 # ==========================================
+# fire-and-forget 태스크가 GC되지 않도록 완료 전까지 참조 유지
+_chat_write_tasks: set = set()
+
+async def _persist_chat(rows: List[Dict[str, Any]]):
+    """채팅 메시지 저장 (에코 응답과 분리된 fire-and-forget 경로)"""
+    try:
+        await supabase.table("messages").insert(rows, returning="minimal").execute()
+    except Exception as e:
+        print(f"Error saving chat: {e}")
+
 async def perform_background_task(conversation_id: str):
     print(f"⏳ [Task] 비동기 작업 시작 (ID: {conversation_id})")
     await asyncio.sleep(5) 
     
     success_msg = "✅ 처리 완료 (5초 후 생성됨)"
-    
+
     try:
-        supabase.table("messages").insert({
+        # created_at은 DB 기본값, 대화의 updated_at은 messages 트리거가 갱신
+        # 결과 행은 쓰지 않으므로 return=minimal로 응답 본문 생략
+        await supabase.table("messages").insert({
             "conversation_id": conversation_id,
             "role": "assistant",
-            "content": success_msg,
-            "created_at": get_utc_now()
-        }).execute()
-        
-        supabase.table("conversations").update({
-            "updated_at": get_utc_now()
-        }).eq("id", conversation_id).execute()
-        
+            "content": success_msg
+        }, returning="minimal").execute()
+
         print(f"✅ [Task] 비동기 작업 완료 및 DB 저장 (ID: {conversation_id})")
         
-        await event_queue.put({
+        await publish_event({
             "conversation_id": conversation_id,
             "status": "done",
             "message": success_msg,
@@ -259,30 +401,44 @@ async def perform_background_task(conversation_id: str):
 # 1. SSE Endpoint
 @app.get("/events")
 async def sse_endpoint(request: Request):
+    queue = asyncio.Queue(maxsize=SSE_MAX_QUEUE_SIZE)
+    subscribers.add(queue)
+
     async def event_generator():
-        while True:
-            if await request.is_disconnected():
-                break
-            try:
-                data = await event_queue.get()
-                yield {
-                    "event": "message",
-                    "data": json.dumps(data, ensure_ascii=False)
-                }
-                event_queue.task_done()
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                print(f"SSE Error: {e}")
-                break
-                
-    return EventSourceResponse(event_generator())
+        try:
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_TIMEOUT)
+                    # 큐에는 이미 직렬화된 문자열이 들어오므로 그대로 전송
+                    yield {
+                        "event": "message",
+                        "data": payload
+                    }
+                except asyncio.TimeoutError:
+                    # 이벤트가 없어도 주기적으로 핑을 보내 끊긴 클라이언트를 감지
+                    yield {"event": "ping", "data": ""}
+                except asyncio.CancelledError:
+                    break
+                except Exception as e:
+                    print(f"SSE Error: {e}")
+                    break
+        finally:
+            subscribers.discard(queue)
+
+    # Content-Encoding을 명시해 GZip 미들웨어가 스트림을 압축(버퍼링)하지 않게 함
+    return EventSourceResponse(event_generator(), headers={"Content-Encoding": "identity"})
 
 # 2. Existing Chat Endpoints
+
+# 백그라운드 처리 분기를 태우는 트리거 키워드 (늘어나면 여기에만 추가)
+CHAT_DELAY_TRIGGERS = ("딜레이",)
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
     # 간이 챗봇 로직 (테스트용)
-    if "딜레이" in request.content:
+    if any(trigger in request.content for trigger in CHAT_DELAY_TRIGGERS):
         response_msg = "⏳ 처리중입니다..."
         if request.conversation_id:
             background_tasks.add_task(perform_background_task, request.conversation_id)
@@ -290,27 +446,24 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
         response_msg = f"Echo: {request.content} (Supabase)"
 
     if request.conversation_id:
-        try:
-            supabase.table("messages").insert({
+        # 사용자/어시스턴트 메시지를 한 번의 INSERT로 저장 (왕복 1회 절감)
+        # created_at은 DB 기본값, 대화의 updated_at은 messages 트리거가 갱신
+        rows = [
+            {
                 "conversation_id": request.conversation_id,
                 "role": "user",
-                "content": request.content,
-                "created_at": get_utc_now()
-            }).execute()
-
-            supabase.table("messages").insert({
+                "content": request.content
+            },
+            {
                 "conversation_id": request.conversation_id,
                 "role": "assistant",
-                "content": response_msg,
-                "created_at": get_utc_now()
-            }).execute()
-            
-            supabase.table("conversations").update({
-                "updated_at": get_utc_now()
-            }).eq("id", request.conversation_id).execute()
-            
-        except Exception as e:
-            print(f"Error saving chat: {e}")
+                "content": response_msg
+            },
+        ]
+        # 저장을 기다리지 않고 에코 응답을 바로 반환 (테스트/에코 모드)
+        task = asyncio.create_task(_persist_chat(rows))
+        _chat_write_tasks.add(task)
+        task.add_done_callback(_chat_write_tasks.discard)
 
     return {
         "type": "text",
@@ -321,65 +474,103 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
 
 # --- Conversations ---
 
-@app.get("/conversations", response_model=List[ConversationSummary])
-async def get_conversations():
-    res = supabase.table("conversations").select("*").order("updated_at", desc=True).execute()
-    return res.data
+@app.get("/conversations")
+async def get_conversations() -> List[ConversationSummary]:
+    cached = _list_cache.get(("conversations",))
+    if cached is not None:
+        return ORJSONResponse(cached)
+    res = await (
+        supabase.table("conversations")
+        .select("id, title, is_pinned, created_at, updated_at")
+        .order("updated_at", desc=True)
+        .execute()
+    )
+    _list_cache[("conversations",)] = res.data
+    return ORJSONResponse(res.data)
 
 @app.post("/conversations", status_code=status.HTTP_201_CREATED, response_model=ConversationSummary)
 async def create_conversation(request: CreateConversationRequest):
     new_title = request.title if request.title else "New Chat"
     data = {
         "title": new_title,
-        "is_pinned": False,
-        "created_at": get_utc_now(),
-        "updated_at": get_utc_now()
+        "is_pinned": False
     }
-    res = supabase.table("conversations").insert(data).execute()
-    if not res.data:
-        raise HTTPException(status_code=500, detail="Failed to create conversation")
-    return res.data[0]
+    res = await supabase.table("conversations").insert(data).execute()
+    invalidate_list_cache("conversations")
+    row = first_row_or(res, 500, "Failed to create conversation")
+    _conv_exists[row["id"]] = True
+    return row
 
-@app.get("/conversations/{conversation_id}", response_model=ConversationDetail)
+@app.get("/conversations/{conversation_id}")
 async def get_conversation_detail(
     conversation_id: str = Path(...),
     limit: int = Query(50),
-    offset: int = Query(0)
-):
-    conv_res = supabase.table("conversations").select("id").eq("id", conversation_id).execute()
-    if not conv_res.data:
-        raise HTTPException(status_code=404, detail="Conversation not found")
-    
-    msg_res = supabase.table("messages")\
-        .select("*")\
-        .eq("conversation_id", conversation_id)\
-        .order("created_at", desc=False)\
-        .range(offset, offset + limit - 1)\
-        .execute()
+    offset: int = Query(0),
+    after: Optional[datetime] = Query(None, description="이 시각 이후 메시지만 조회 (키셋 페이지네이션)")
+) -> ConversationDetail:
+    # 긴 대화는 offset 페이지네이션이 O(offset)이므로 created_at 커서를 우선 사용
+    msg_query = (
+        supabase.table("messages")
+        .select("*")
+        .eq("conversation_id", conversation_id)
+        .order("created_at", desc=False)
+    )
+    if after is not None:
+        msg_query = msg_query.gt("created_at", after.isoformat()).limit(limit)
+    else:
+        msg_query = msg_query.range(offset, offset + limit - 1)
+
+    if conversation_id in _conv_exists:
+        # 최근에 존재가 확인된 대화면 메시지 조회만 수행
+        msg_res = await msg_query.execute()
+    else:
+        # 존재 확인과 메시지 조회는 독립적이므로 동시에 실행 (RTT 1회분 단축)
+        # 존재 확인은 행 본문 없이 count 헤더만 받는 HEAD 요청으로 처리
+        conv_res, msg_res = await asyncio.gather(
+            supabase.table("conversations")
+            .select("id", head=True, count="exact")
+            .eq("id", conversation_id)
+            .execute(),
+            msg_query.execute(),
+        )
+        if not conv_res.count:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+        _conv_exists[conversation_id] = True
         
-    return {
+    return ORJSONResponse({
         "id": conversation_id,
         "messages": msg_res.data
-    }
+    })
 
 @app.patch("/conversations/{conversation_id}", response_model=ConversationSummary)
 async def update_conversation(conversation_id: str, request: UpdateConversationRequest):
-    update_data = {"updated_at": get_utc_now()}
+    # updated_at은 트리거가 갱신
+    update_data = {}
     if request.title is not None:
         update_data["title"] = request.title
     if request.is_pinned is not None:
         update_data["is_pinned"] = request.is_pinned
-        
-    res = supabase.table("conversations").update(update_data).eq("id", conversation_id).execute()
-    if not res.data:
-        raise HTTPException(status_code=404, detail="Conversation not found")
-    return res.data[0]
+
+    if not update_data:
+        res = await supabase.table("conversations").select("*").eq("id", conversation_id).execute()
+    else:
+        res = await supabase.table("conversations").update(update_data).eq("id", conversation_id).execute()
+    invalidate_list_cache("conversations")
+    return first_row_or(res, 404, "Conversation not found")
 
 @app.post("/conversations/{conversation_id}/delete", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_conversation(conversation_id: str):
-    res = supabase.table("conversations").delete().eq("id", conversation_id).execute()
-    if not res.data:
-         raise HTTPException(status_code=404, detail="Conversation not found")
+    # 삭제된 행 본문 대신 count만 받아 존재 여부 판단, 메시지는 FK CASCADE로 함께 삭제
+    res = await (
+        supabase.table("conversations")
+        .delete(count="exact", returning="minimal")
+        .eq("id", conversation_id)
+        .execute()
+    )
+    if not res.count:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    invalidate_list_cache("conversations")
+    _conv_exists.pop(conversation_id, None)
     return None
 
 # --- [추가됨] Scenario Sessions ---
@@ -391,7 +582,7 @@ async def create_scenario_session(conversation_id: str, request: CreateSessionRe
     """
     # 실제로는 'scenario_sessions' 테이블에 저장해야 하지만, 
     # 현재 단계에서는 세션 ID만 발급하여 프론트엔드 흐름을 유지합니다.
-    session_id = str(uuid4())
+    session_id = uuid4().hex
     
     # (선택) 여기에 세션 생성 DB 로직 추가 가능
     
@@ -402,30 +593,78 @@ async def create_scenario_session(conversation_id: str, request: CreateSessionRe
         "status": "active"
     }
 
+# --- [추가됨] Batch ---
+
+BATCH_MAX_REQUESTS = 50
+
+@app.post("/batch")
+async def batch(request: BatchRequest):
+    """여러 API 요청을 한 번의 호출로 묶어 처리합니다. (왕복 횟수 감소)"""
+    if len(request.requests) > BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Too many sub-requests (max {BATCH_MAX_REQUESTS})"
+        )
+    for sub in request.requests:
+        # /batch 중첩 호출은 gather 팬아웃이 무한 증폭되므로 차단
+        if httpx.URL("http://batch").join(sub.url).path.rstrip("/") == "/batch":
+            raise HTTPException(
+                status_code=422,
+                detail="Nested /batch sub-requests are not allowed"
+            )
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://batch"
+    ) as client:
+        async def dispatch(sub: BatchSubRequest):
+            try:
+                res = await client.request(sub.method.upper(), sub.url, json=sub.body)
+                try:
+                    body = res.json()
+                except ValueError:
+                    body = None
+                return {"id": sub.id, "status": res.status_code, "body": body}
+            except Exception as e:
+                print(f"Error in batch sub-request ({sub.method} {sub.url}): {e}")
+                return {"id": sub.id, "status": 500, "body": {"detail": str(e)}}
+
+        responses = await asyncio.gather(*(dispatch(sub) for sub in request.requests))
+
+    return {"responses": list(responses)}
+
 # 2. Scenarios / Shortcuts
 
-@app.get("/scenarios", response_model=List[ShortcutCategory])
-async def get_client_scenarios():
+@app.get("/scenarios")
+async def get_client_scenarios() -> List[ShortcutCategory]:
     """클라이언트용 숏컷(시나리오 카테고리) 목록 조회"""
+    if time.monotonic() < _shortcuts_cache["exp"]:
+        return ORJSONResponse(_shortcuts_cache["data"])
     try:
-        res = supabase.table("shortcuts").select("content").eq("id", 1).execute()
+        res = await supabase.table("shortcuts").select("content").eq("id", 1).execute()
         if res.data and len(res.data) > 0:
-            return res.data[0]["content"]
+            _shortcuts_cache["data"] = res.data[0]["content"]
+            _shortcuts_cache["exp"] = time.monotonic() + SHORTCUTS_CACHE_TTL
+            return ORJSONResponse(_shortcuts_cache["data"])
     except Exception as e:
         print(f"Error fetching shortcuts from DB: {e}")
-    return []
+    return _empty_list_resp
 
 @app.post("/scenarios", status_code=status.HTTP_201_CREATED)
-async def save_client_scenarios(scenarios: List[ShortcutCategory]):
+async def save_client_scenarios(raw_request: Request):
     """클라이언트용 숏컷 저장"""
+    # 큰 숏컷 트리는 json.loads 선행 없이 pydantic-core에서 파싱+검증을 한 번에 수행
+    try:
+        scenarios = SHORTCUTS_ADAPTER.validate_json(await raw_request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
     data = {
         "id": 1,
-        "content": [s.model_dump() for s in scenarios],
-        "updated_at": get_utc_now()
+        # 요소별 model_dump() 루프 대신 어댑터가 트리 전체를 한 번에 직렬화
+        "content": SHORTCUTS_ADAPTER.dump_python(scenarios, mode="json")
     }
-    res = supabase.table("shortcuts").upsert(data).execute()
+    res = await supabase.table("shortcuts").upsert(data).execute()
     if not res.data:
         raise HTTPException(status_code=500, detail="Failed to save scenarios")
+    _shortcuts_cache["exp"] = 0.0  # 저장 시 캐시 무효화
     return {"status": "success", "data": res.data}
 
 @app.get("/scenarios/list")
@@ -433,35 +672,101 @@ async def get_real_scenario_list():
     """숏컷 에디터용: 실제 DB에 존재하는 시나리오 ID와 이름 목록 반환"""
     try:
         # admin_scenarios 테이블에서 id, name 조회
-        res = supabase.table("admin_scenarios").select("id, name").execute()
+        res = await supabase.table("admin_scenarios").select("id, name").execute()
         return res.data 
     except Exception as e:
         print(f"Error fetching scenario list: {e}")
-        return []
+        return _empty_list_resp
 
 # --- Admin/Management Endpoints ---
 
 admin_router = APIRouter(prefix="/api/v1/chat")
 
-@admin_router.get("/scenarios/{tenant_id}/{stage_id}", response_model=ScenarioListResponse)
-async def list_admin_scenarios(tenant_id: str, stage_id: str):
-    res = supabase.table("admin_scenarios")\
-        .select("id, name, job, description, updated_at, last_used_at")\
-        .eq("tenant_id", tenant_id)\
-        .eq("stage_id", stage_id)\
-        .order("updated_at", desc=True)\
-        .execute()
-    return {"scenarios": res.data}
-
-@admin_router.get("/scenarios/{tenant_id}/{stage_id}/{scenario_id}", response_model=ScenarioDetail)
-async def get_admin_scenario_detail(tenant_id: str, stage_id: str, scenario_id: str):
-    res = supabase.table("admin_scenarios").select("*").eq("id", scenario_id).execute()
-    if not res.data:
-        raise HTTPException(status_code=404, detail="Scenario not found")
-    return res.data[0]
+@admin_router.get("/scenarios/{tenant_id}/{stage_id}")
+async def list_admin_scenarios(
+    tenant_id: str,
+    stage_id: str,
+    limit: int = Query(50, le=200),
+    cursor: Optional[str] = Query(None, description="직전 응답의 next_cursor (키셋 페이지네이션)"),
+) -> ScenarioListResponse:
+    cache_key = ("admin_scenarios", tenant_id, stage_id, limit, cursor)
+    cached = _list_cache.get(cache_key)
+    if cached is not None:
+        return ORJSONResponse(cached)
+    query = (
+        supabase.table("admin_scenarios")
+        .select("id, name, job, description, updated_at, last_used_at")
+        .eq("tenant_id", tenant_id)
+        .eq("stage_id", stage_id)
+        .order("updated_at", desc=True)
+        .order("id", desc=True)
+        .limit(limit + 1)
+    )
+    if cursor:
+        # 커서는 "updated_at,id" 복합 키: 트리거/복제로 updated_at이 동일한 행이
+        # 흔하므로 (updated_at, id) 순서쌍으로 잘라야 경계의 동률 행이 누락되지 않음
+        ts, _, last_id = cursor.partition(",")
+        if last_id:
+            query = query.or_(
+                f'updated_at.lt."{ts}",and(updated_at.eq."{ts}",id.lt."{last_id}")'
+            )
+        else:
+            query = query.lt("updated_at", ts)
+    res = await query.execute()
+
+    # limit+1개를 조회해 다음 페이지 존재 여부 판단
+    scenarios = res.data[:limit]
+    next_cursor = (
+        f'{scenarios[-1]["updated_at"]},{scenarios[-1]["id"]}'
+        if len(res.data) > limit else None
+    )
+    payload = {"scenarios": scenarios, "next_cursor": next_cursor}
+    _list_cache[cache_key] = payload
+    return ORJSONResponse(payload)
+
+@admin_router.get("/scenarios/{tenant_id}/{stage_id}/{scenario_id}")
+async def get_admin_scenario_detail(tenant_id: str, stage_id: str, scenario_id: str) -> ScenarioDetail:
+    scenario = _detail_cache.get(("scenario", scenario_id))
+    if scenario is None:
+        res = await supabase.table("admin_scenarios").select("*").eq("id", scenario_id).execute()
+        scenario = first_row_or(res, 404, "Scenario not found")
+        _detail_cache[("scenario", scenario_id)] = scenario
+
+    # nodes/edges가 큰 시나리오는 전체 JSON을 메모리에 쌓지 않고 노드 단위로 스트리밍
+    def stream_scenario():
+        nodes = scenario.get("nodes") or []
+        edges = scenario.get("edges") or []
+        meta = {k: v for k, v in scenario.items() if k not in ("nodes", "edges")}
+        yield orjson.dumps(meta)[:-1] + b',"nodes":['
+        for i, node in enumerate(nodes):
+            yield (b"," if i else b"") + orjson.dumps(node)
+        yield b'],"edges":['
+        for i, edge in enumerate(edges):
+            yield (b"," if i else b"") + orjson.dumps(edge)
+        yield b"]}"
+
+    return StreamingResponse(stream_scenario(), media_type="application/json")
 
 @admin_router.post("/scenarios/{tenant_id}/{stage_id}", status_code=status.HTTP_201_CREATED, response_model=ScenarioDetail)
 async def create_admin_scenario(tenant_id: str, stage_id: str, request: CreateScenarioRequest):
+    now = get_utc_now()
+
+    if request.clone_from_id:
+        # 복제는 DB 함수(clone_scenario)의 INSERT ... SELECT 한 번으로 처리
+        # (nodes/edges JSONB를 애플리케이션으로 왕복시키지 않음)
+        res = await supabase.rpc("clone_scenario", {
+            "src_id": request.clone_from_id,
+            "p_tenant_id": tenant_id,
+            "p_stage_id": stage_id,
+            "p_name": request.name,
+            "p_job": request.job,
+            "p_description": request.description,
+            "p_category_id": request.category_id,
+            "p_last_used_at": now,
+        }).execute()
+        invalidate_list_cache("admin_scenarios", tenant_id, stage_id)
+        return first_row_or(res, 404, "Scenario to clone not found")
+
     new_data = {
         "tenant_id": tenant_id,
         "stage_id": stage_id,
@@ -472,112 +777,158 @@ async def create_admin_scenario(tenant_id: str, stage_id: str, request: CreateSc
         "edges": request.edges,
         "start_node_id": request.start_node_id,
         "category_id": request.category_id,
-        "created_at": get_utc_now(),
-        "updated_at": get_utc_now(),
-        "last_used_at": get_utc_now()
+        "last_used_at": now
     }
-    
-    if request.clone_from_id:
-        original = supabase.table("admin_scenarios").select("*").eq("id", request.clone_from_id).execute()
-        if original.data:
-            org = original.data[0]
-            new_data["nodes"] = org["nodes"]
-            new_data["edges"] = org["edges"]
-            new_data["start_node_id"] = org["start_node_id"]
-    
-    res = supabase.table("admin_scenarios").insert(new_data).execute()
-    if not res.data:
-        raise HTTPException(status_code=500, detail="Failed to create scenario")
-    return res.data[0]
+    res = await supabase.table("admin_scenarios").insert(new_data).execute()
+    invalidate_list_cache("admin_scenarios", tenant_id, stage_id)
+    return first_row_or(res, 500, "Failed to create scenario")
 
 @admin_router.put("/scenarios/{tenant_id}/{stage_id}/{scenario_id}", response_model=ScenarioDetail)
-async def update_admin_scenario(tenant_id: str, stage_id: str, scenario_id: str, request: UpdateScenarioRequest):
+async def update_admin_scenario(tenant_id: str, stage_id: str, scenario_id: str, raw_request: Request):
+    # 대형 노드 그래프 본문도 파싱+검증을 한 번에 수행
+    try:
+        request = UpdateScenarioRequest.model_validate_json(await raw_request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
     update_data = {
         "name": request.name,
         "job": request.job,
         "description": request.description,
         "nodes": request.nodes,
         "edges": request.edges,
-        "start_node_id": request.start_node_id,
-        "updated_at": get_utc_now()
+        "start_node_id": request.start_node_id
     }
-    res = supabase.table("admin_scenarios").update(update_data).eq("id", scenario_id).execute()
-    if not res.data:
-        raise HTTPException(status_code=404, detail="Scenario not found")
-    return res.data[0]
+    res = await supabase.table("admin_scenarios").update(update_data).eq("id", scenario_id).execute()
+    invalidate_list_cache("admin_scenarios", tenant_id, stage_id)
+    _detail_cache.pop(("scenario", scenario_id), None)
+    return first_row_or(res, 404, "Scenario not found")
 
 @admin_router.patch("/scenarios/{tenant_id}/{stage_id}/{scenario_id}", response_model=ScenarioListItem)
 async def patch_admin_scenario(tenant_id: str, stage_id: str, scenario_id: str, request: PatchScenarioRequest):
-    update_data = {"updated_at": get_utc_now()}
+    # updated_at은 트리거가 갱신
+    update_data = {}
     if request.name is not None: update_data["name"] = request.name
     if request.job is not None: update_data["job"] = request.job
     if request.description is not None: update_data["description"] = request.description
     if request.last_used_at is not None: update_data["last_used_at"] = request.last_used_at
-    
-    res = supabase.table("admin_scenarios").update(update_data).eq("id", scenario_id).execute()
-    if not res.data:
-        raise HTTPException(status_code=404, detail="Scenario not found")
-    return res.data[0]
+
+    if not update_data:
+        res = await supabase.table("admin_scenarios").select("*").eq("id", scenario_id).execute()
+    else:
+        res = await supabase.table("admin_scenarios").update(update_data).eq("id", scenario_id).execute()
+    invalidate_list_cache("admin_scenarios", tenant_id, stage_id)
+    _detail_cache.pop(("scenario", scenario_id), None)
+    return first_row_or(res, 404, "Scenario not found")
 
 @admin_router.post("/scenarios/{tenant_id}/{stage_id}/{scenario_id}/delete", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_admin_scenario(tenant_id: str, stage_id: str, scenario_id: str):
-    res = supabase.table("admin_scenarios").delete().eq("id", scenario_id).execute()
-    if not res.data:
+    # 대형 nodes/edges가 담긴 삭제 행을 되돌려받지 않도록 return=minimal
+    res = await (
+        supabase.table("admin_scenarios")
+        .delete(count="exact", returning="minimal")
+        .eq("id", scenario_id)
+        .execute()
+    )
+    if not res.count:
         raise HTTPException(status_code=404, detail="Scenario not found")
+    invalidate_list_cache("admin_scenarios", tenant_id, stage_id)
+    _detail_cache.pop(("scenario", scenario_id), None)
     return None
 
 # --- Templates ---
 
-@admin_router.get("/templates/api/{tenant_id}", response_model=List[Dict])
-async def list_api_templates(tenant_id: str):
-    res = supabase.table("api_templates").select("*").eq("tenant_id", tenant_id).execute()
-    return res.data
+@admin_router.get("/templates/api/{tenant_id}")
+async def list_api_templates(tenant_id: str) -> List[Dict]:
+    cache_key = ("api_templates", tenant_id)
+    cached = _list_cache.get(cache_key)
+    if cached is not None:
+        return ORJSONResponse(cached)
+    res = await (
+        supabase.table("api_templates")
+        .select("id, name, method, url, headers, body, responseMapping")
+        .eq("tenant_id", tenant_id)
+        .execute()
+    )
+    _list_cache[cache_key] = res.data
+    return ORJSONResponse(res.data)
 
 @admin_router.post("/templates/api/{tenant_id}", status_code=status.HTTP_201_CREATED)
 async def create_api_template(tenant_id: str, request: ApiTemplateCreate):
-    data = request.model_dump()
+    data = request.model_dump(mode="json")
     data["tenant_id"] = tenant_id
-    res = supabase.table("api_templates").insert(data).execute()
+    res = await supabase.table("api_templates").insert(data).execute()
+    invalidate_list_cache("api_templates", tenant_id)
     return res.data[0]
 
 @admin_router.post("/templates/api/{tenant_id}/{template_id}/delete", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_api_template(tenant_id: str, template_id: str):
-    supabase.table("api_templates").delete().eq("id", template_id).execute()
+    await supabase.table("api_templates").delete().eq("id", template_id).execute()
+    invalidate_list_cache("api_templates", tenant_id)
     return None
 
-@admin_router.get("/templates/form/{tenant_id}", response_model=List[Dict])
-async def list_form_templates(tenant_id: str):
-    res = supabase.table("form_templates").select("*").eq("tenant_id", tenant_id).execute()
-    return res.data
+@admin_router.get("/templates/form/{tenant_id}")
+async def list_form_templates(tenant_id: str) -> List[Dict]:
+    cache_key = ("form_templates", tenant_id)
+    cached = _list_cache.get(cache_key)
+    if cached is not None:
+        return ORJSONResponse(cached)
+    res = await (
+        supabase.table("form_templates")
+        .select("id, name, title, elements")
+        .eq("tenant_id", tenant_id)
+        .execute()
+    )
+    _list_cache[cache_key] = res.data
+    return ORJSONResponse(res.data)
 
 @admin_router.post("/templates/form/{tenant_id}", status_code=status.HTTP_201_CREATED)
 async def create_form_template(tenant_id: str, request: FormTemplateCreate):
-    data = request.model_dump()
+    data = request.model_dump(mode="json")
     data["tenant_id"] = tenant_id
-    res = supabase.table("form_templates").insert(data).execute()
+    res = await supabase.table("form_templates").insert(data).execute()
+    invalidate_list_cache("form_templates", tenant_id)
     return res.data[0]
 
 @admin_router.post("/templates/form/{tenant_id}/{template_id}/delete", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_form_template(tenant_id: str, template_id: str):
-    supabase.table("form_templates").delete().eq("id", template_id).execute()
+    await supabase.table("form_templates").delete().eq("id", template_id).execute()
+    invalidate_list_cache("form_templates", tenant_id)
     return None
 
 # --- Settings ---
-@admin_router.get("/settings/{tenant_id}/node_visibility", response_model=NodeVisibilitySettings)
-async def get_node_visibility(tenant_id: str):
-    res = supabase.table("settings").select("node_visibility").eq("tenant_id", tenant_id).execute()
+@admin_router.get("/settings/{tenant_id}/node_visibility")
+async def get_node_visibility(tenant_id: str) -> NodeVisibilitySettings:
+    cached = _detail_cache.get(("node_vis", tenant_id))
+    if cached is not None:
+        return ORJSONResponse(cached)
+    res = await supabase.table("settings").select("node_visibility").eq("tenant_id", tenant_id).execute()
     if res.data:
-        return res.data[0]["node_visibility"]
-    return {"visibleNodeTypes": ["message", "form", "api", "branch", "condition"]}
+        _detail_cache[("node_vis", tenant_id)] = res.data[0]["node_visibility"]
+        return ORJSONResponse(res.data[0]["node_visibility"])
+    return _default_node_vis_resp
 
 @admin_router.put("/settings/{tenant_id}/node_visibility", response_model=NodeVisibilitySettings)
 async def update_node_visibility(tenant_id: str, settings: NodeVisibilitySettings):
     data = {"tenant_id": tenant_id, "node_visibility": settings.model_dump()}
-    res = supabase.table("settings").upsert(data).execute()
+    res = await supabase.table("settings").upsert(data).execute()
+    _detail_cache.pop(("node_vis", tenant_id), None)
     return res.data[0]["node_visibility"]
 
 app.include_router(admin_router)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8001, reload=True)
\ No newline at end of file
+
+    if os.getenv("APP_ENV") == "production":
+        # 프로덕션: uvloop + httptools C 구현 + 코어 수만큼 워커
+        uvicorn.run(
+            "main:app",
+            host="0.0.0.0",
+            port=8001,
+            loop="uvloop",
+            http="httptools",
+            workers=os.cpu_count(),
+            reload=False,
+        )
+    else:
+        uvicorn.run("main:app", host="0.0.0.0", port=8001, reload=True)
\ No newline at end of file
@@ -0,0 +1,33 @@
+-- updated_at 관리를 DB 트리거로 이전
+-- (애플리케이션이 쓰기마다 보내던 추가 UPDATE 왕복 제거)
+
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at := now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER t_conversations_updated
+    BEFORE INSERT OR UPDATE ON conversations
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+CREATE TRIGGER t_admin_scenarios_updated
+    BEFORE INSERT OR UPDATE ON admin_scenarios
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+CREATE TRIGGER t_shortcuts_updated
+    BEFORE INSERT OR UPDATE ON shortcuts
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+-- 메시지가 저장되면 소속 대화의 updated_at을 함께 갱신
+CREATE OR REPLACE FUNCTION touch_conversation() RETURNS trigger AS $$
+BEGIN
+    UPDATE conversations SET updated_at = now() WHERE id = NEW.conversation_id;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER t_messages_touch_conversation
+    AFTER INSERT ON messages
+    FOR EACH ROW EXECUTE FUNCTION touch_conversation();
@@ -0,0 +1,12 @@
+-- created_at / updated_at 기본값을 DB로 이전
+-- (애플리케이션이 INSERT 페이로드에 타임스탬프를 싣지 않아도 되도록)
+
+ALTER TABLE conversations ALTER COLUMN created_at SET DEFAULT now();
+ALTER TABLE conversations ALTER COLUMN updated_at SET DEFAULT now();
+
+ALTER TABLE messages ALTER COLUMN created_at SET DEFAULT now();
+
+ALTER TABLE admin_scenarios ALTER COLUMN created_at SET DEFAULT now();
+ALTER TABLE admin_scenarios ALTER COLUMN updated_at SET DEFAULT now();
+
+ALTER TABLE shortcuts ALTER COLUMN updated_at SET DEFAULT now();
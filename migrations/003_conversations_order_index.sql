@@ -0,0 +1,3 @@
+-- 대화 목록 정렬(ORDER BY updated_at DESC, 핀 고정 우선)을 위한 인덱스
+CREATE INDEX IF NOT EXISTS idx_conversations_pinned_updated
+    ON conversations (is_pinned DESC, updated_at DESC);
@@ -0,0 +1,4 @@
+-- 시나리오 목록의 키셋 페이지네이션 쿼리
+-- (tenant_id, stage_id 필터 + updated_at/id 내림차순 정렬)를 인덱스 스캔으로 처리
+CREATE INDEX IF NOT EXISTS idx_admin_scenarios_list
+    ON admin_scenarios (tenant_id, stage_id, updated_at DESC, id DESC);
@@ -0,0 +1,8 @@
+-- 대화 삭제 시 소속 메시지를 DB에서 원자적으로 함께 삭제
+ALTER TABLE messages
+    DROP CONSTRAINT IF EXISTS fk_messages_conversation;
+
+ALTER TABLE messages
+    ADD CONSTRAINT fk_messages_conversation
+        FOREIGN KEY (conversation_id) REFERENCES conversations (id)
+        ON DELETE CASCADE;
@@ -0,0 +1,22 @@
+-- 시나리오 복제를 DB 내부의 INSERT ... SELECT 한 번으로 처리
+-- (대형 nodes/edges JSONB를 애플리케이션으로 왕복시키지 않음)
+CREATE OR REPLACE FUNCTION clone_scenario(
+    src_id uuid,
+    p_tenant_id text,
+    p_stage_id text,
+    p_name text,
+    p_job text,
+    p_description text,
+    p_category_id text,
+    p_last_used_at timestamptz
+) RETURNS SETOF admin_scenarios
+LANGUAGE sql AS $$
+    INSERT INTO admin_scenarios
+        (tenant_id, stage_id, name, job, description, category_id,
+         nodes, edges, start_node_id, last_used_at)
+    SELECT p_tenant_id, p_stage_id, p_name, p_job, p_description, p_category_id,
+           nodes, edges, start_node_id, p_last_used_at
+    FROM admin_scenarios
+    WHERE id = src_id
+    RETURNING *;
+$$;